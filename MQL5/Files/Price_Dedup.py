@@ -0,0 +1,191 @@
+import copy
+import os
+import pickle
+import tempfile
+import threading
+import time
+import uuid
+
+def request_fingerprint(hasher, price_binary, params):
+    """
+    Fingerprints an encoded price window together with its analysis parameters
+    hasher is a function like sha256_to_binary that maps bytes to a binary string
+    """
+    payload = price_binary + "|" + repr(sorted(params.items()))
+    return format(int(hasher(payload.encode("ascii")), 2), "064x")
+
+class AnalysisDeduplicator:
+    """
+    Runs each unique (window, parameters) request once and fans the result back out
+    Duplicates are collapsed within a batch and, with cache_dir, across processes
+    The owner of a lock keeps it fresh while analysing, so a lock older than
+    wait_timeout can only be left behind by a dead process and is taken over
+    """
+
+    def __init__(self, analyze, hasher, cache_dir=None, wait_timeout=600, poll_interval=0.5):
+        self.analyze = analyze
+        self.hasher = hasher
+        self.cache_dir = cache_dir
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.requests = 0
+        self.computed = 0
+        self.cache_hits = 0
+        self.memo = {}
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".pkl", base + ".lock"
+
+    def _load(self, result_path):
+        try:
+            with open(result_path, "rb") as f:
+                return True, pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+    def _lock_age(self, lock_path):
+        try:
+            return time.time() - os.path.getmtime(lock_path)
+        except FileNotFoundError:
+            # Released in the meantime
+            return 0.0
+
+    def _lock_owner(self, lock_path):
+        try:
+            with open(lock_path) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _claim(self, lock_path, token):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(token)
+        return True
+
+    def _release(self, lock_path, token):
+        # Only remove the lock if it is still ours
+        if self._lock_owner(lock_path) == token:
+            try:
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+
+    def _break_stale(self, lock_path):
+        owner = self._lock_owner(lock_path)
+        if owner is None:
+            return
+        # Move the lock aside atomically, so only one waiter can take it
+        stale_path = f"{lock_path}.{uuid.uuid4().hex}.stale"
+        try:
+            os.rename(lock_path, stale_path)
+        except FileNotFoundError:
+            return
+        if self._lock_owner(stale_path) != owner:
+            # Another waiter replaced the stale lock in the meantime, put it back
+            try:
+                os.link(stale_path, lock_path)
+            except FileExistsError:
+                pass
+        os.remove(stale_path)
+
+    def _heartbeat(self, lock_path, token, stop):
+        # Keep the lock fresh so waiting processes do not consider it stale
+        interval = max(self.wait_timeout / 3, 0.05)
+        while not stop.wait(interval):
+            if self._lock_owner(lock_path) != token:
+                return
+            try:
+                os.utime(lock_path)
+            except FileNotFoundError:
+                return
+
+    def _store(self, result_path, result):
+        # Write to a temporary file first so readers never see a partial result
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(result, f)
+        os.replace(tmp_path, result_path)
+
+    def _compute(self, price_binary, params):
+        self.computed += 1
+        return self.analyze(price_binary, **params)
+
+    def _resolve(self, key, price_binary, params):
+        if self.cache_dir is None:
+            return self._compute(price_binary, params)
+
+        result_path, lock_path = self._paths(key)
+        token = f"{os.getpid()}-{uuid.uuid4().hex}"
+        while True:
+            found, result = self._load(result_path)
+            if found:
+                self.cache_hits += 1
+                return result
+            # Claim the request so other processes wait instead of recomputing
+            if self._claim(lock_path, token):
+                break
+            if self._lock_age(lock_path) > self.wait_timeout:
+                # The owner died without releasing its lock
+                self._break_stale(lock_path)
+                continue
+            time.sleep(self.poll_interval)
+
+        # Another process may have finished between our last check and the claim
+        found, result = self._load(result_path)
+        if found:
+            self._release(lock_path, token)
+            self.cache_hits += 1
+            return result
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(lock_path, token, stop), daemon=True)
+        heartbeat.start()
+        try:
+            result = self._compute(price_binary, params)
+            self._store(result_path, result)
+            return result
+        finally:
+            stop.set()
+            heartbeat.join()
+            self._release(lock_path, token)
+
+    def run(self, requests):
+        """
+        Analyses a batch of (price_binary, params) requests
+        Returns the results in the same order as the requests
+        Every requester gets its own copy, so results can be modified safely
+        """
+        groups = {}
+        for index, (price_binary, params) in enumerate(requests):
+            key = request_fingerprint(self.hasher, price_binary, params)
+            groups.setdefault(key, []).append(index)
+
+        results = [None] * len(requests)
+        for key, indices in groups.items():
+            price_binary, params = requests[indices[0]]
+            if key in self.memo:
+                self.cache_hits += 1
+            else:
+                self.memo[key] = self._resolve(key, price_binary, params)
+            result = self.memo[key]
+            for index in indices:
+                results[index] = copy.deepcopy(result)
+        self.requests += len(requests)
+        return results
+
+    def dedup_ratio(self):
+        """Share of requests that did not need a fresh analysis"""
+        if self.requests == 0:
+            return 0.0
+        return 1 - self.computed / self.requests
+
+    def print_report(self):
+        print(f"\nRequests: {self.requests}, analysed: {self.computed}, "
+              f"cache hits: {self.cache_hits}, dedup ratio: {self.dedup_ratio():.2%}")
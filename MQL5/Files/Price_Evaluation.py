@@ -0,0 +1,170 @@
+import math
+import numpy as np
+
+def horizons_to_array(horizons):
+    """Converts a list of equal-length binary strings into a 2D array of 0/1"""
+    if len(horizons) == 0:
+        raise ValueError("No horizons to evaluate")
+    if isinstance(horizons, np.ndarray):
+        if horizons.ndim != 2:
+            raise ValueError("Horizon array must be 2D (points x horizon length)")
+        bits = horizons.astype(np.uint8)
+        if not np.array_equal(bits, horizons):
+            raise ValueError("Horizons must contain only 0 and 1")
+    else:
+        width = len(horizons[0])
+        if any(len(h) != width for h in horizons):
+            raise ValueError("All horizons must have the same length")
+        raw = np.frombuffer("".join(horizons).encode("ascii"), dtype=np.uint8)
+        bits = (raw - ord("0")).reshape(len(horizons), width)
+    # Characters other than '0' and '1' wrap around to values above 1
+    if (bits > 1).any():
+        raise ValueError("Horizons must contain only 0 and 1")
+    return bits
+
+def horizon_trends(horizons):
+    """Returns True (BULL) for rows with more 1s than 0s, as in compare_horizons"""
+    bits = horizons_to_array(horizons)
+    return bits.sum(axis=1) * 2 > bits.shape[1]
+
+def bit_accuracy(real_horizons, predicted_horizons):
+    """Share of matching bits for every horizon pair"""
+    real = horizons_to_array(real_horizons)
+    pred = horizons_to_array(predicted_horizons)
+    return (real == pred).mean(axis=1)
+
+def position_accuracy(real_horizons, predicted_horizons):
+    """Share of matching bits for every position in the horizon"""
+    real = horizons_to_array(real_horizons)
+    pred = horizons_to_array(predicted_horizons)
+    return (real == pred).mean(axis=0)
+
+def direction_results(real_horizons, predicted_horizons):
+    """True where the predominant direction matches (WIN), False otherwise (LOSS)"""
+    return horizon_trends(real_horizons) == horizon_trends(predicted_horizons)
+
+def confusion_matrix(real, predicted):
+    """
+    2x2 confusion matrix of boolean or 0/1 arrays
+    Rows are real values (0, 1), columns are predicted values (0, 1)
+    """
+    real = np.asarray(real, dtype=np.uint8).ravel()
+    predicted = np.asarray(predicted, dtype=np.uint8).ravel()
+    return np.bincount(real * 2 + predicted, minlength=4).reshape(2, 2)
+
+def bootstrap_ci(values, n_boot=1000, confidence=0.95, seed=None):
+    """Bootstrap confidence interval of the mean of values"""
+    values = np.asarray(values, dtype=float)
+    rng = np.random.default_rng(seed)
+    # Resampling with replacement only changes how often each distinct value
+    # is drawn, so sample those counts instead of individual indices
+    levels, counts = np.unique(values, return_counts=True)
+    draws = rng.multinomial(len(values), counts / len(values), size=n_boot)
+    means = draws @ levels / len(values)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(means, [tail, 100 - tail])
+    return float(low), float(high)
+
+def binomial_p_value(successes, trials, p=0.5):
+    """One-sided p-value (normal approximation) that the win rate exceeds p"""
+    if trials == 0 or p <= 0 or p >= 1:
+        return 1.0
+    z = (successes - trials * p) / math.sqrt(trials * p * (1 - p))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def persistence_baseline(history_binaries, horizon_length):
+    """Repeats the last bit of every history sequence across the horizon"""
+    history = horizons_to_array(history_binaries)
+    return np.repeat(history[:, -1:], horizon_length, axis=1)
+
+def majority_trend_baseline(history_binaries, horizon_length):
+    """
+    Fills the horizon with the majority bit of every history sequence
+    Same rule as calculate_trend_ratio / predict_trend: BULL if ones ratio > 0.5
+    """
+    history = horizons_to_array(history_binaries)
+    bull = history.mean(axis=1) > 0.5
+    return np.repeat(bull[:, None], horizon_length, axis=1).astype(np.uint8)
+
+def chance_win_rate(real_horizons, predicted_horizons):
+    """
+    Win rate expected if predictions were independent of reality
+    Ties count as BEAR, so chance is not 50% for even horizon lengths
+    """
+    real_bull = horizon_trends(real_horizons).mean()
+    pred_bull = horizon_trends(predicted_horizons).mean()
+    return float(real_bull * pred_bull + (1 - real_bull) * (1 - pred_bull))
+
+def _score(real, pred, n_boot, seed):
+    wins = direction_results(real, pred)
+    accuracy = bit_accuracy(real, pred)
+    chance = chance_win_rate(real, pred)
+    return {
+        'bit_accuracy': float(accuracy.mean()),
+        'bit_accuracy_ci': bootstrap_ci(accuracy, n_boot, seed=seed),
+        'win_rate': float(wins.mean()),
+        'win_rate_ci': bootstrap_ci(wins, n_boot, seed=seed),
+        'wins': int(wins.sum()),
+        'chance_win_rate': chance,
+        'p_value': binomial_p_value(int(wins.sum()), len(wins), chance),
+    }
+
+def evaluate_predictions(real_horizons, predicted_horizons, history_binaries=None, n_boot=1000, seed=None):
+    """
+    Scores a batch of predicted horizons against the real ones
+    When history_binaries are given, persistence and majority-trend baselines are scored too
+    """
+    real = horizons_to_array(real_horizons)
+    pred = horizons_to_array(predicted_horizons)
+    if real.shape != pred.shape:
+        raise ValueError("Real and predicted horizons must have the same shape")
+
+    report = _score(real, pred, n_boot, seed)
+    report['points'] = real.shape[0]
+    report['position_accuracy'] = position_accuracy(real, pred)
+    report['bit_confusion'] = confusion_matrix(real, pred)
+    report['direction_confusion'] = confusion_matrix(horizon_trends(real), horizon_trends(pred))
+
+    report['baselines'] = {}
+    if history_binaries is not None:
+        history = horizons_to_array(history_binaries)
+        if history.shape[0] != real.shape[0]:
+            raise ValueError("There must be one history sequence per horizon")
+        horizon_length = real.shape[1]
+        baselines = {
+            'persistence': persistence_baseline(history, horizon_length),
+            'majority_trend': majority_trend_baseline(history, horizon_length),
+        }
+        for name, baseline in baselines.items():
+            report['baselines'][name] = _score(real, baseline, n_boot, seed)
+    return report
+
+def print_evaluation(report):
+    """Prints an evaluation report produced by evaluate_predictions"""
+    print(f"\n=== PREDICTION QUALITY ({report['points']} points) ===")
+    low, high = report['bit_accuracy_ci']
+    print(f"Bit match accuracy: {report['bit_accuracy']:.2%} (CI {low:.2%} - {high:.2%})")
+    low, high = report['win_rate_ci']
+    print(f"Direction win rate: {report['win_rate']:.2%} (CI {low:.2%} - {high:.2%})")
+    print(f"Chance win rate: {report['chance_win_rate']:.2%}, p-value: {report['p_value']:.4f}")
+
+    print("\nAccuracy per horizon position:")
+    for i, accuracy in enumerate(report['position_accuracy']):
+        print("{:<5} {:.2%}".format(i + 1, accuracy))
+
+    print("\nDirection confusion matrix (rows real, columns predicted):")
+    print("{:<6} {:<8} {:<8}".format("", "BEAR", "BULL"))
+    for label, row in zip(("BEAR", "BULL"), report['direction_confusion']):
+        print("{:<6} {:<8} {:<8}".format(label, row[0], row[1]))
+
+    if report['baselines']:
+        print("\nBaselines:")
+        print("{:<16} {:<10} {:<10} {:<10}".format("Model", "Bit acc.", "Win rate", "P-value"))
+        print("-" * 46)
+        print("{:<16} {:<10.2%} {:<10.2%} {:<10.4f}".format(
+            "prediction", report['bit_accuracy'], report['win_rate'], report['p_value']
+        ))
+        for name, score in report['baselines'].items():
+            print("{:<16} {:<10.2%} {:<10.2%} {:<10.4f}".format(
+                name, score['bit_accuracy'], score['win_rate'], score['p_value']
+            ))
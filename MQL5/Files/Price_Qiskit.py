@@ -6,6 +6,9 @@ from qiskit.visualization import plot_histogram
 from Crypto.Hash import SHA256
 import pandas as pd
 from datetime import datetime, timedelta
+from Price_Evaluation import evaluate_predictions, print_evaluation
+from Price_Dedup import AnalysisDeduplicator
+from Price_Timeframes import MultiTimeframeFeed, TIMEFRAME_NAMES
 
 def initialize_mt5():
     if not mt5.initialize():
@@ -22,9 +25,8 @@ def get_price_data(symbol="EURUSD", timeframe=mt5.TIMEFRAME_D1, n_candles=256, o
 
 def prices_to_binary(df):
     """Converts price movements into a binary sequence"""
-    binary_sequence = ""
-    for i in range(1, len(df)):
-        binary_sequence += "1" if df['close'][i] > df['close'][i-1] else "0"
+    closes = df['close'].to_numpy()
+    binary_sequence = "".join(np.where(np.diff(closes) > 0, "1", "0"))
     return binary_sequence.zfill(256)
 
 def calculate_future_horizon(current_data, future_data, horizon=10):
@@ -125,6 +127,17 @@ def analyze_market_state(price_binary, num_qubits=22):
     dlog_value = int(best_match, 2)
     return dlog_value, counts
 
+def analyze_market_states(price_binaries, num_qubits=22, cache_dir=None):
+    """
+    Analyzes a batch of price windows, running each unique window only once
+    With cache_dir, results are shared between processes scanning the same windows
+    """
+    deduplicator = AnalysisDeduplicator(analyze_market_state, sha256_to_binary, cache_dir=cache_dir)
+    requests = [(price_binary, {'num_qubits': num_qubits}) for price_binary in price_binaries]
+    results = deduplicator.run(requests)
+    deduplicator.print_report()
+    return results
+
 def compare_horizons(real_horizon, predicted_horizon):
     """
     Compares the direction of the real and predicted horizons
@@ -232,6 +245,80 @@ def analyze_from_point(timepoint_offset, n_candles=256, horizon_length=10):
     except Exception as e:
         print(f"Error during analysis: {str(e)}")
 
+def backtest_from_points(offsets, n_candles=256, horizon_length=10, cache_dir=None):
+    """
+    Runs the analysis from many past points and prints batch prediction statistics
+    offsets - numbers of candles back from the current moment
+    cache_dir - optional folder to reuse analysis results across reruns and processes
+    """
+    if len(offsets) == 0:
+        print("No points to backtest")
+        return None
+
+    try:
+        # One request covers the history and future of every point
+        total_candles = max(offsets) + horizon_length + n_candles
+        data = get_price_data(n_candles=total_candles)
+        if data is None or len(data) < total_candles:
+            print("Failed to retrieve backtest data")
+            return None
+
+        histories, real_horizons = [], []
+        for offset in offsets:
+            end = len(data) - offset - horizon_length
+            historical_data = data.iloc[end - n_candles:end]
+            future_data = data.iloc[end:end + horizon_length]
+
+            histories.append(prices_to_binary(historical_data))
+            real_horizons.append(calculate_future_horizon(historical_data, future_data, horizon_length))
+
+        if cache_dir is not None:
+            # Consecutive points are shifted by one candle and rarely share a window,
+            # so deduplication pays off only when reruns or parallel processes share cache_dir
+            analyses = analyze_market_states(histories, cache_dir=cache_dir)
+        else:
+            analyses = [analyze_market_state(price_binary) for price_binary in histories]
+        predicted_horizons = [predict_horizon(quantum_counts, horizon_length) for _, quantum_counts in analyses]
+
+        report = evaluate_predictions(real_horizons, predicted_horizons, histories)
+        print_evaluation(report)
+        return report
+
+    except Exception as e:
+        print(f"Error during analysis: {str(e)}")
+        return None
+
+def analyze_timeframes(timeframe_names, n_candles=256, base_timeframe=mt5.TIMEFRAME_M5):
+    """
+    Encodes several timeframes from a single base price stream
+    timeframe_names - list of names like ["H1", "H4", "D1"]
+    """
+    try:
+        timeframes = [TIMEFRAME_NAMES[name.strip().upper()] for name in timeframe_names]
+    except KeyError as e:
+        print(f"Unknown timeframe: {e.args[0]}, available: {', '.join(TIMEFRAME_NAMES)}")
+        return None
+
+    try:
+        # One broker request for the base timeframe, higher timeframes are resampled from it
+        feed = MultiTimeframeFeed(symbol="EURUSD", base_timeframe=base_timeframe)
+        if not feed.load(timeframes, n_candles=n_candles):
+            print("Failed to retrieve base timeframe data")
+            return None
+        binaries = feed.binaries(prices_to_binary, timeframes, n_candles)
+
+        print("\n=== MULTI-TIMEFRAME OVERVIEW ===")
+        print("{:<6} {:<8} {:<64}".format("TF", "Trend", "Binary sequence (last 64 bits)"))
+        print("-" * 80)
+        for name, timeframe in zip(timeframe_names, timeframes):
+            price_binary = binaries[timeframe]
+            print("{:<6} {:<8} {:<64}".format(name.strip().upper(), predict_trend(price_binary), price_binary[-64:]))
+        return binaries
+
+    except Exception as e:
+        print(f"Error during multi-timeframe analysis: {str(e)}")
+        return None
+
 def main():
     if not initialize_mt5():
         return
@@ -240,9 +327,19 @@ def main():
         # Request the event horizon point offset
         offset = int(input("Enter the event horizon point offset (number of candles back from the current moment): "))
         horizon_length = int(input("Enter the event horizon length (default is 10): ") or "10")
+        points = int(input("Enter the number of consecutive points to backtest (default is 1): ") or "1")
+        
+        if points > 1:
+            # Score every point from offset to offset + points - 1
+            backtest_from_points(range(offset, offset + points), horizon_length=horizon_length)
+        else:
+            # Perform analysis from the given point
+            analyze_from_point(offset, horizon_length=horizon_length)
         
-        # Perform analysis from the given point
-        analyze_from_point(offset, horizon_length=horizon_length)
+        # Optional overview of several timeframes built from one price stream
+        timeframe_names = input("Enter timeframes for a multi-timeframe overview, e.g. H1,H4,D1 (empty to skip): ")
+        if timeframe_names.strip():
+            analyze_timeframes(timeframe_names.split(","))
         
     finally:
         mt5.shutdown()
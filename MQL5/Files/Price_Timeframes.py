@@ -0,0 +1,163 @@
+import MetaTrader5 as mt5
+import pandas as pd
+
+# Length of each supported timeframe in minutes
+TIMEFRAME_MINUTES = {
+    mt5.TIMEFRAME_M1: 1,
+    mt5.TIMEFRAME_M5: 5,
+    mt5.TIMEFRAME_M15: 15,
+    mt5.TIMEFRAME_M30: 30,
+    mt5.TIMEFRAME_H1: 60,
+    mt5.TIMEFRAME_H4: 240,
+    mt5.TIMEFRAME_D1: 1440,
+}
+
+# MT5 timeframe constants by their usual names, e.g. for parsing user input
+TIMEFRAME_NAMES = {
+    "M1": mt5.TIMEFRAME_M1,
+    "M5": mt5.TIMEFRAME_M5,
+    "M15": mt5.TIMEFRAME_M15,
+    "M30": mt5.TIMEFRAME_M30,
+    "H1": mt5.TIMEFRAME_H1,
+    "H4": mt5.TIMEFRAME_H4,
+    "D1": mt5.TIMEFRAME_D1,
+}
+
+# How each OHLC column is aggregated when building a higher timeframe bar
+OHLC_AGGREGATION = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'tick_volume': 'sum',
+    'spread': 'max',
+    'real_volume': 'sum',
+}
+
+def timeframe_rule(timeframe):
+    """Returns the pandas resampling rule for an MT5 timeframe"""
+    if timeframe not in TIMEFRAME_MINUTES:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return f"{TIMEFRAME_MINUTES[timeframe]}min"
+
+def resample_ohlc(base_data, timeframe):
+    """Builds higher timeframe OHLC bars from time-indexed base bars"""
+    columns = {col: agg for col, agg in OHLC_AGGREGATION.items() if col in base_data.columns}
+    bars = base_data.resample(timeframe_rule(timeframe), label='left', closed='left', origin='epoch').agg(columns)
+    # Periods without any base bar (weekends, holidays) produce empty rows
+    return bars[bars['open'].notna()]
+
+class MultiTimeframeFeed:
+    """
+    Fetches one base timeframe from MT5 and derives higher timeframes from it
+    Derived series are cached and updated incrementally as new base bars arrive
+    """
+
+    def __init__(self, symbol="EURUSD", base_timeframe=mt5.TIMEFRAME_M5, max_base_bars=100000):
+        if base_timeframe not in TIMEFRAME_MINUTES:
+            raise ValueError(f"Unsupported base timeframe: {base_timeframe}")
+        self.symbol = symbol
+        self.base_timeframe = base_timeframe
+        self.max_base_bars = max_base_bars
+        self.base_data = None
+        self.offset = 0
+        self.derived = {}
+
+    def _fetch(self, n_candles, offset=0):
+        rates = mt5.copy_rates_from_pos(self.symbol, self.base_timeframe, offset, n_candles)
+        if rates is None or len(rates) == 0:
+            return None
+        df = pd.DataFrame(rates)
+        df['time'] = pd.to_datetime(df['time'], unit='s')
+        df.set_index('time', inplace=True)
+        return df
+
+    def bars_needed(self, timeframe, n_candles):
+        """Number of base bars required to derive n_candles of a timeframe"""
+        ratio = TIMEFRAME_MINUTES[timeframe] // TIMEFRAME_MINUTES[self.base_timeframe]
+        # One extra bucket covers the partial bar dropped at the start
+        return (n_candles + 1) * max(ratio, 1)
+
+    def load(self, timeframes, n_candles=256, offset=0):
+        """
+        Fetches enough base bars for every timeframe in a single request
+        A feed loaded with offset > 0 is a historical snapshot and cannot be updated
+        """
+        for timeframe in timeframes:
+            timeframe_rule(timeframe)
+            if TIMEFRAME_MINUTES[timeframe] < TIMEFRAME_MINUTES[self.base_timeframe]:
+                raise ValueError(f"Timeframe {timeframe} is finer than the base timeframe")
+        count = max(self.bars_needed(tf, n_candles) for tf in timeframes)
+        if count > self.max_base_bars:
+            raise ValueError(f"{n_candles} candles need {count} base bars, above max_base_bars={self.max_base_bars}; "
+                             f"use a coarser base timeframe or raise max_base_bars")
+        base_data = self._fetch(count, offset)
+        if base_data is None:
+            return False
+        if len(base_data) < count:
+            print(f"Warning: only {len(base_data)} of {count} base bars available, "
+                  f"higher timeframes will have fewer than {n_candles} candles")
+        self.base_data = base_data
+        self.offset = offset
+        self.derived = {}
+        return True
+
+    def _first_complete(self, timeframe):
+        # A bucket is complete only if base data starts at or before its open
+        return self.base_data.index[0].ceil(timeframe_rule(timeframe))
+
+    def _derive(self, timeframe, start=None):
+        base = self.base_data if start is None else self.base_data.loc[start:]
+        bars = resample_ohlc(base, timeframe)
+        return bars[bars.index >= self._first_complete(timeframe)]
+
+    def update(self, lookback=100):
+        """
+        Fetches the latest base bars and refreshes only the affected derived bars
+        Returns the number of new base bars appended
+        """
+        if self.base_data is None:
+            raise RuntimeError("Feed is not loaded, call load() first")
+        if self.offset > 0:
+            raise RuntimeError("Feed was loaded with an offset, only live feeds (offset=0) can be updated")
+        latest = self._fetch(lookback)
+        if latest is None:
+            return 0
+        last_time = self.base_data.index[-1]
+        if latest.index[0] > last_time:
+            # Gap larger than the lookback window, rebuild from scratch
+            rebuilt = self._fetch(min(len(self.base_data) + lookback, self.max_base_bars))
+            if rebuilt is None:
+                return 0
+            self.base_data = rebuilt
+            self.derived = {tf: self._derive(tf) for tf in self.derived}
+            return int((rebuilt.index > last_time).sum())
+
+        # The last stored bar may still have been forming, so replace it as well
+        fresh = latest[latest.index >= last_time]
+        new_bars = int((fresh.index > last_time).sum())
+        base_data = pd.concat([self.base_data[self.base_data.index < fresh.index[0]], fresh])
+        self.base_data = base_data.iloc[-self.max_base_bars:]
+
+        for timeframe, bars in self.derived.items():
+            start = fresh.index[0].floor(timeframe_rule(timeframe))
+            refreshed = self._derive(timeframe, start)
+            kept = bars[(bars.index < start) & (bars.index >= self._first_complete(timeframe))]
+            self.derived[timeframe] = pd.concat([kept, refreshed])
+        return new_bars
+
+    def get(self, timeframe, n_candles=None):
+        """Returns OHLC bars of a timeframe derived from the base series"""
+        if self.base_data is None:
+            raise RuntimeError("Feed is not loaded, call load() first")
+        if timeframe == self.base_timeframe:
+            bars = self.base_data
+        else:
+            if timeframe not in self.derived:
+                self.derived[timeframe] = self._derive(timeframe)
+            bars = self.derived[timeframe]
+        return bars if n_candles is None else bars.iloc[-n_candles:]
+
+    def binaries(self, encoder, timeframes, n_candles=256):
+        """Encodes every timeframe with the given encoder, e.g. prices_to_binary"""
+        return {tf: encoder(self.get(tf, n_candles)) for tf in timeframes}